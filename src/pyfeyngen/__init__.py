@@ -1,94 +1,134 @@
 from .parser import parse_reaction
 from .layout import FeynmanGraph
 from .exporter import generate_physical_tikz
-from .errors import InvalidReactionError, UnknownParticleError
-from .logger import setup_logging, logger
+from .errors import InvalidReactionError, UnknownParticleError, UnboundPlaceholderError
+from .logger import setup_logging, logger, debug_output, render_logger
 from .layout_engine import LayeredLayout
-import logging
+from .template import compile_reaction, ReactionTemplate
+from .collapse import collapse_graph
+from .particledb import set_particle_database
+from concurrent.futures import ThreadPoolExecutor
 
 __version__ = "0.1.2"
 __author__ = "Saux Paulhenry & Contributors"
 
-def quick_render(reaction_string, user_dict=None, debug=False):
+def quick_render(reaction_string, user_dict=None, debug=False, place_labels=False):
     """
     Parse a reaction string, build the Feynman graph, and generate TikZ code.
     Args:
         reaction_string (str): The reaction string to parse and render.
         user_dict (dict, optional): Custom particle info dictionary.
-        debug (bool): If True, enables debug logging.
+        debug (bool): If True, logs debug output for this call only.
+        place_labels (bool): If True, label sides and bends are chosen from the layered layout
+            to avoid collisions instead of alternating per vertex.
     Returns:
         str: TikZ code for the Feynman diagram, or a LaTeX comment on error.
     """
-    # Enable debug logging if requested
-    if debug:
-        setup_logging(True)
-    try:
-        # Parse the reaction string into a structured format
-        structure = parse_reaction(reaction_string)
-        # Build the Feynman graph from the parsed structure
-        graph = FeynmanGraph(structure)
-        # Log graph node and edge information for debugging
-        logger.debug(f"\nNodes created: {graph.v_count} vertex, {graph.in_count} inputs, {graph.f_count} outputs.")
-        logger.debug("\nEdge list:")
-        logger.debug(f"{'Source':<10} | {'Target':<10} | {'Particle':<10}")
-        logger.debug("-" * 35)
-        for src, dst, particle in graph.edges:
-            logger.debug(f"{src:<10} | {dst:<10} | {particle:<10}")
-        logger.debug("-" * 35)
-        logger.debug("\nAnchor points:")
-        logger.debug(graph.anchor_points)
+    # Enable debug logging for this call only if requested
+    with debug_output(debug):
+        try:
+            # Parse the reaction string into a structured format
+            structure = parse_reaction(reaction_string)
+            # Build the Feynman graph from the parsed structure
+            graph = FeynmanGraph(structure)
+            # Log graph node and edge information for debugging
+            render_logger.debug(f"\nNodes created: {graph.v_count} vertex, {graph.in_count} inputs, {graph.f_count} outputs.")
+            render_logger.debug("\nEdge list:")
+            render_logger.debug(f"{'Source':<10} | {'Target':<10} | {'Particle':<10}")
+            render_logger.debug("-" * 35)
+            for src, dst, particle in graph.edges:
+                render_logger.debug(f"{src:<10} | {dst:<10} | {particle:<10}")
+            render_logger.debug("-" * 35)
+            render_logger.debug("\nAnchor points:")
+            render_logger.debug(graph.anchor_points)
 
-        # Generate the TikZ code from the graph and user dictionary
-        return generate_physical_tikz(graph, user_dict)
-    except InvalidReactionError as e:
-        # Return a LaTeX comment for syntax errors
-        return f"% Syntax error: {e}"
-    except UnknownParticleError as e:
-        # Return a LaTeX comment for unknown particle errors
-        return f"% Physics error: {e}"
-    except Exception as e:
-        # Return a LaTeX comment for any unexpected error
-        return f"% Unexpected error: {e}"
+            # Generate the TikZ code from the graph and user dictionary
+            placements = LayeredLayout(graph).get_label_placements(user_dict) if place_labels else None
+            return generate_physical_tikz(graph, user_dict, placements)
+        except InvalidReactionError as e:
+            # Return a LaTeX comment for syntax errors
+            return f"% Syntax error: {e}"
+        except UnknownParticleError as e:
+            # Return a LaTeX comment for unknown particle errors
+            return f"% Physics error: {e}"
+        except Exception as e:
+            # Return a LaTeX comment for any unexpected error
+            return f"% Unexpected error: {e}"
     
-def quick_geometry(reaction_string, x_spacing=150, y_spacing=100, debug=False):
+def quick_geometry(reaction_string, x_spacing=150, y_spacing=100, debug=False, place_labels=False):
     """
     Parse a reaction string and return node coordinates and metadata as a dictionary.
     Args:
         reaction_string (str): The reaction string to parse and layout.
-        debug (bool): If True, enables debug logging.
+        debug (bool): If True, logs debug output for this call only.
+        place_labels (bool): If True, label positions and bend signs avoid collisions and
+            each edge gets 'label_side' and 'label_pos'.
     Returns:
         dict: Geometry data for nodes and edges, or error information.
     """
-    # Enable debug logging if requested
-    if debug:
-        setup_logging(True)
+    # Enable debug logging for this call only if requested
+    with debug_output(debug):
+        try:
+            # 1. Standard pipeline: Parse -> Graph
+            structure = parse_reaction(reaction_string)
+            graph = FeynmanGraph(structure)
 
-    try:
-        # 1. Standard pipeline: Parse -> Graph
-        structure = parse_reaction(reaction_string)
-        graph = FeynmanGraph(structure)
+            # 2. Geometry pipeline: Layout engine
+            engine = LayeredLayout(graph, x_spacing, y_spacing)
 
-        # 2. Geometry pipeline: Layout engine
-        engine = LayeredLayout(graph, x_spacing, y_spacing)
+            # 3. Compute and retrieve geometry data for Inkscape
+            geometry_data = engine.get_inkscape_data(place_labels=place_labels)
 
-        # 3. Compute and retrieve geometry data for Inkscape
-        geometry_data = engine.get_inkscape_data()
+            if debug:
+                render_logger.debug(f"Geometry calculated for {len(geometry_data['nodes'])} nodes.")
 
-        if debug:
-            logger = logging.getLogger("pyfeyngen")
-            logger.debug(f"Geometry calculated for {len(geometry_data['nodes'])} nodes.")
+            return geometry_data
 
-        return geometry_data
+        except Exception as e:
+            if debug:
+                print(f"Error in quick_geometry: {e}")
+            return {"error": str(e)}
 
-    except Exception as e:
-        if debug:
-            print(f"Error in quick_geometry: {e}")
-        return {"error": str(e)}
+def quick_render_batch(reactions, user_dict=None, debug=False, max_workers=None, place_labels=False):
+    """
+    Render several reaction strings to TikZ code on a thread pool.
+    The parser, graph builder, particle lookups and exporter share no mutable state,
+    so this scales with the number of cores on free-threaded CPython.
+    Args:
+        reactions (iterable): Reaction strings to render.
+        user_dict (dict, optional): Custom particle info dictionary (only read).
+        debug (bool): If True, logs debug output for this call only.
+        max_workers (int, optional): Number of threads (ThreadPoolExecutor default if None).
+        place_labels (bool): If True, label sides and bends avoid collisions (see quick_render).
+    Returns:
+        list: TikZ code (or LaTeX error comment) for each reaction, in input order.
+    """
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        return list(pool.map(lambda r: quick_render(r, user_dict, debug, place_labels), reactions))
+
+def quick_geometry_batch(reactions, x_spacing=150, y_spacing=100, debug=False, max_workers=None, place_labels=False):
+    """
+    Compute geometry data for several reaction strings on a thread pool.
+    Args:
+        reactions (iterable): Reaction strings to layout.
+        max_workers (int, optional): Number of threads (ThreadPoolExecutor default if None).
+        place_labels (bool): If True, labels avoid collisions (see quick_geometry).
+    Returns:
+        list: Geometry dictionary (or error information) for each reaction, in input order.
+    """
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        return list(pool.map(lambda r: quick_geometry(r, x_spacing, y_spacing, debug, place_labels), reactions))
 
 __all__ = [
     "parse_reaction",
     "FeynmanGraph",
     "generate_physical_tikz",
+    "collapse_graph",
+    "set_particle_database",
     "quick_render",
-    "quick_geometry"
+    "quick_geometry",
+    "quick_render_batch",
+    "quick_geometry_batch",
+    "compile_reaction",
+    "ReactionTemplate"
 ]
\ No newline at end of file
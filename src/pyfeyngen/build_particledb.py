@@ -0,0 +1,46 @@
+import sys
+from .particledb import write_particle_database
+
+# Converter from a CSV particle table to the packed format read by particledb.
+# The package never imports it, so "python -m pyfeyngen.build_particledb" does not load it twice.
+
+
+def read_particle_csv(path):
+    """
+    Read a particle table from a CSV file with the columns name, style, label, is_anti,
+    antiparticle and charge (lines starting with '#' are ignored).
+    Args:
+        path (str): CSV file path.
+    Returns:
+        dict: Entries for write_particle_database.
+    """
+    import csv  # Only needed to build tables
+    entries = {}
+    with open(path, newline='', encoding='utf-8') as f:
+        rows = csv.DictReader(line for line in f if not line.startswith('#'))
+        for row in rows:
+            entries[row['name']] = {
+                'style': row['style'],
+                'label': row['label'],
+                'is_anti': row['is_anti'].strip() in ('1', 'true', 'True'),
+                'antiparticle': row.get('antiparticle') or None,
+                'charge': row.get('charge') or 0,
+            }
+    return entries
+
+
+def build_particle_database(csv_path, path):
+    """
+    Convert a CSV particle table to a particle database file.
+    Args:
+        csv_path (str): CSV file path (see read_particle_csv).
+        path (str): Output file path.
+    """
+    write_particle_database(read_particle_csv(csv_path), path)
+
+
+if __name__ == '__main__':
+    # python -m pyfeyngen.build_particledb table.csv table.pfdb
+    if len(sys.argv) != 3:
+        sys.exit("Usage: python -m pyfeyngen.build_particledb <input.csv> <output.pfdb>")
+    build_particle_database(sys.argv[1], sys.argv[2])
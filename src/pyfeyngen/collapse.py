@@ -0,0 +1,111 @@
+import copy
+
+
+def collapse_graph(graph, max_size=None, max_depth=None, expanded=()):
+    """
+    Level-of-detail pass: hide large or deep subtrees of a Feynman graph behind single blob vertices.
+    A vertex is collapsed when the edges below it (after collapsing its own subtrees) exceed max_size,
+    or when it lies max_depth steps or more from an input. Edges crossing into a collapsed subtree
+    (e.g. anchor links) stay drawn, rewired to its blob vertex.
+    Args:
+        graph: The FeynmanGraph object to simplify (left untouched).
+        max_size (int, optional): Maximum number of edges kept below a vertex.
+        max_depth (int, optional): Depth (from the inputs) at which vertices are collapsed.
+        expanded (iterable, optional): Vertices to keep open, e.g. blobs the caller chose to expand.
+            Their ancestors are kept open as well.
+    Returns:
+        tuple: (collapsed graph, mapping from each blob vertex to the 'nodes' and 'edges' it hides,
+            the original 'rewired' edges drawn to or from it, and its summary 'label').
+            Calling again with the blob in `expanded` opens it one level.
+    """
+    # 1. Tree structure: the first incoming edge of a node comes from its parent
+    parent = {}
+    children = {}
+    incoming = {}
+    nodes = []
+    for src, dst, _ in graph.edges:
+        for node_id in (src, dst):
+            if node_id not in incoming:
+                incoming[node_id] = 0
+                nodes.append(node_id)
+        incoming[dst] += 1
+        if dst not in parent and src != dst:
+            parent[dst] = src
+            children.setdefault(src, []).append(dst)
+
+    # Depth-first order from the roots (iterative, graphs can be very deep)
+    order = []
+    depth = {}
+    stack = [(n, 0) for n in reversed(nodes) if n not in parent]
+    while stack:
+        node_id, d = stack.pop()
+        depth[node_id] = d
+        order.append(node_id)
+        stack.extend((child, d + 1) for child in reversed(children.get(node_id, [])))
+
+    # Expanded vertices and their ancestors are never collapsed
+    protected = set()
+    for node_id in expanded:
+        while node_id is not None and node_id not in protected:
+            protected.add(node_id)
+            node_id = parent.get(node_id)
+
+    # 2. Choose the vertices to collapse, bottom-up
+    collapsed = set()
+    size = {}
+    for node_id in reversed(order):
+        kids = children.get(node_id, [])
+        size[node_id] = sum(incoming[c] + (0 if c in collapsed else size[c]) for c in kids)
+        if not kids or node_id not in parent or node_id in protected:
+            continue
+        if (max_size is not None and size[node_id] > max_size) or \
+                (max_depth is not None and depth[node_id] >= max_depth):
+            collapsed.add(node_id)
+
+    # 3. Representative of each node: itself, or the outermost collapsed ancestor hiding it
+    rep = {}
+    for node_id in order:
+        up = parent.get(node_id)
+        if up is None:
+            rep[node_id] = node_id
+        elif rep[up] != up or up in collapsed:
+            rep[node_id] = rep[up]
+        else:
+            rep[node_id] = node_id
+
+    # 4. Rewrite the edges and record what each blob hides
+    mapping = {}
+    edges = []
+    for edge in graph.edges:
+        src, dst, particle = edge
+        new_src, new_dst = rep.get(src, src), rep.get(dst, dst)
+        if new_src == src and new_dst == dst:
+            edges.append(edge)
+            continue
+        if new_src == new_dst:
+            # Both ends inside the same blob: the edge is hidden
+            _entry(mapping, new_src)['edges'].append(edge)
+        else:
+            # Edge crossing into a collapsed subtree (e.g. an anchor link): drawn from/to the blob
+            edges.append((new_src, new_dst, particle))
+            for blob, node_id in ((new_src, src), (new_dst, dst)):
+                if blob != node_id:
+                    _entry(mapping, blob)['rewired'].append(edge)
+    for node_id in order:
+        if rep[node_id] != node_id:
+            mapping[rep[node_id]]['nodes'].append(node_id)
+
+    view = copy.copy(graph)
+    view.edges = edges
+    view.vertex_styles = dict(graph.vertex_styles)
+    view.vertex_labels = dict(getattr(graph, 'vertex_labels', {}))
+    for blob, hidden in mapping.items():
+        hidden['label'] = f"{len(hidden['edges'])} edges"
+        view.vertex_styles[blob] = 'blob'
+        view.vertex_labels[blob] = hidden['label']
+    return view, mapping
+
+
+def _entry(mapping, blob):
+    """Return the mapping entry of a blob vertex, creating it if needed."""
+    return mapping.setdefault(blob, {'nodes': [], 'edges': [], 'rewired': []})
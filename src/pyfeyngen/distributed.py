@@ -0,0 +1,319 @@
+import json
+import os
+import socket
+import sys
+import threading
+import time
+
+
+class WorkQueue:
+    """
+    Interface of a work-queue backend for distributed batch rendering.
+    A job is a list of shards (lists of reaction strings); workers lease shards, render them
+    and store their results. FileQueue implements it on a shared directory.
+    """
+    def put_job(self, shards, options):
+        """Store the shards of a new job and its rendering options."""
+        raise NotImplementedError
+
+    def get_options(self):
+        """Return the rendering options of the job, or None if no job was submitted yet."""
+        raise NotImplementedError
+
+    def claim(self, worker_id, lease_seconds):
+        """
+        Lease a shard with no result and no live lease.
+        Returns (shard_id, attempt, items) or None; the attempt identifies the caller's lease.
+        """
+        raise NotImplementedError
+
+    def release(self, shard_id, attempt):
+        """Give a leased shard back so it can be claimed again, if the lease is still the caller's."""
+        raise NotImplementedError
+
+    def complete(self, shard_id, attempt, results):
+        """Store the results of a shard leased by the given attempt."""
+        raise NotImplementedError
+
+    def pending(self):
+        """Return the number of shards without results."""
+        raise NotImplementedError
+
+    def results(self):
+        """Return the results of every shard, in shard order."""
+        raise NotImplementedError
+
+
+class FileQueue(WorkQueue):
+    """
+    Work queue stored in a directory shared by every node (e.g. over NFS).
+    Layout: job.json, shards/<id>.json, leases/<id>.<attempt>.json and results/<id>.json.
+    Leases are created with os.link, which fails if the file exists, so exactly one worker wins
+    each attempt; results are written to a temporary file then renamed, and the leases of a
+    finished shard are removed. Lease expiry uses the wall clock, so node clocks must be
+    roughly synchronized.
+    Each instance scans shards from the one after its last claim and remembers finished shards,
+    so a worker checks every shard a bounded number of times instead of listing the whole job
+    on each claim.
+    """
+    def __init__(self, directory):
+        self.directory = directory
+        self._shards = os.path.join(directory, 'shards')
+        self._leases = os.path.join(directory, 'leases')
+        self._results = os.path.join(directory, 'results')
+        self._count = None
+        # Shards known to be finished, so they are not checked again by this instance
+        self._done = set()
+        # Shard where the next claim starts looking
+        self._cursor = 0
+
+    def _write(self, path, data):
+        """Write JSON data atomically (temporary file + rename)."""
+        tmp = f"{path}.{socket.gethostname()}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        os.replace(tmp, path)
+
+    def _read(self, path):
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+
+    def _shard_count(self):
+        if self._count is None:
+            self._count = self._read(os.path.join(self.directory, 'job.json'))['shards']
+        return self._count
+
+    def put_job(self, shards, options):
+        if os.path.exists(os.path.join(self.directory, 'job.json')):
+            raise ValueError(f"'{self.directory}' already contains a job.")
+        for path in (self._shards, self._leases, self._results):
+            os.makedirs(path, exist_ok=True)
+        for i, items in enumerate(shards):
+            self._write(os.path.join(self._shards, f"{i:06d}.json"), items)
+        # Written last: workers only start once every shard exists
+        self._write(os.path.join(self.directory, 'job.json'), {'shards': len(shards), 'options': options})
+
+    def get_options(self):
+        try:
+            return self._read(os.path.join(self.directory, 'job.json'))['options']
+        except FileNotFoundError:
+            return None
+
+    def _lease_path(self, shard_id, attempt):
+        return os.path.join(self._leases, f"{shard_id:06d}.{attempt}.json")
+
+    def _result_path(self, shard_id):
+        return os.path.join(self._results, f"{shard_id:06d}.json")
+
+    def _latest_attempt(self, shard_id):
+        """Return the latest lease attempt of an unfinished shard, or None if it was never leased."""
+        attempt = -1
+        while os.path.exists(self._lease_path(shard_id, attempt + 1)):
+            attempt += 1
+        return attempt if attempt >= 0 else None
+
+    def _is_finished(self, shard_id):
+        if shard_id in self._done:
+            return True
+        if os.path.exists(self._result_path(shard_id)):
+            self._done.add(shard_id)
+            return True
+        return False
+
+    def _finished(self):
+        """Return the set of shards with results (one directory listing)."""
+        self._done.update(int(name[:-5]) for name in os.listdir(self._results) if name.endswith('.json'))
+        return self._done
+
+    def claim(self, worker_id, lease_seconds):
+        now = time.time()
+        count = self._shard_count()
+        for offset in range(count):
+            shard_id = (self._cursor + offset) % count
+            if self._is_finished(shard_id):
+                continue
+            attempt = self._latest_attempt(shard_id)
+            if attempt is not None:
+                try:
+                    if self._read(self._lease_path(shard_id, attempt))['expires'] > now:
+                        continue
+                except FileNotFoundError:
+                    # Removed by the worker that just finished the shard
+                    continue
+            # New lease, or retry of an expired/released one
+            attempt = attempt + 1 if attempt is not None else 0
+            path = self._lease_path(shard_id, attempt)
+            tmp = f"{path}.{socket.gethostname()}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump({'worker': worker_id, 'expires': now + lease_seconds}, f)
+            try:
+                os.link(tmp, path)
+            except FileExistsError:
+                # Another worker took this attempt
+                continue
+            finally:
+                os.remove(tmp)
+            # The shard may have been completed (and its leases removed) while it was checked
+            if self._is_finished(shard_id):
+                self._remove_leases(shard_id, attempt)
+                continue
+            self._cursor = (shard_id + 1) % count
+            return shard_id, attempt, self._read(os.path.join(self._shards, f"{shard_id:06d}.json"))
+        return None
+
+    def release(self, shard_id, attempt):
+        # Only the caller's own attempt is expired: a newer attempt belongs to another worker
+        path = self._lease_path(shard_id, attempt)
+        try:
+            data = self._read(path)
+        except FileNotFoundError:
+            return
+        data['expires'] = 0
+        self._write(path, data)
+
+    def _remove_leases(self, shard_id, attempt):
+        """Remove the lease files of a finished shard, up to the given attempt."""
+        for i in range(attempt + 1):
+            try:
+                os.remove(self._lease_path(shard_id, i))
+            except FileNotFoundError:
+                pass
+
+    def complete(self, shard_id, attempt, results):
+        # A shard retried after an expired lease may complete twice; both results are identical
+        self._write(self._result_path(shard_id), results)
+        self._done.add(shard_id)
+        self._remove_leases(shard_id, attempt)
+
+    def pending(self):
+        return self._shard_count() - len(self._finished())
+
+    def results(self):
+        return [self._read(self._result_path(i)) for i in range(self._shard_count())]
+
+
+def submit_batch(queue, reactions, shard_size=100, mode='tikz', user_dict=None, x_spacing=150, y_spacing=100,
+                 place_labels=False):
+    """
+    Split reactions into shards and store them in a work queue (coordinator side).
+    Args:
+        queue (WorkQueue): Queue backend, e.g. FileQueue on a shared directory.
+        reactions (iterable): Reaction strings to render.
+        shard_size (int): Number of reactions per shard.
+        mode (str): 'tikz' for quick_render output, 'geometry' for quick_geometry output.
+        user_dict (dict, optional): Custom particle info dictionary (tikz mode).
+        x_spacing (int): Horizontal distance between columns (geometry mode).
+        y_spacing (int): Vertical distance between nodes (geometry mode).
+        place_labels (bool): If True, labels avoid collisions (see quick_render and quick_geometry).
+    Returns:
+        int: Number of shards.
+    """
+    if mode not in ('tikz', 'geometry'):
+        raise ValueError(f"Unknown rendering mode '{mode}'.")
+    reactions = list(reactions)
+    shards = [reactions[i:i + shard_size] for i in range(0, len(reactions), shard_size)]
+    options = {'mode': mode, 'user_dict': user_dict, 'x_spacing': x_spacing, 'y_spacing': y_spacing,
+               'place_labels': place_labels}
+    queue.put_job(shards, options)
+    return len(shards)
+
+
+def _render_shard(items, options, max_workers):
+    """Render the reactions of a shard with the thread-pool batch functions."""
+    from . import quick_render_batch, quick_geometry_batch
+    if options['mode'] == 'geometry':
+        return quick_geometry_batch(items, options['x_spacing'], options['y_spacing'], max_workers=max_workers,
+                                    place_labels=options.get('place_labels', False))
+    return quick_render_batch(items, options['user_dict'], max_workers=max_workers,
+                              place_labels=options.get('place_labels', False))
+
+
+def run_worker(queue, worker_id=None, lease_seconds=600, max_workers=None, poll_interval=1.0, timeout=None):
+    """
+    Claim, render and complete shards until the whole job is finished (worker side, one per node).
+    Workers may start before the coordinator: they wait until a job is submitted.
+    When every remaining shard is leased by another worker, waits and claims the ones whose lease
+    expires, so shards of crashed workers are retried.
+    Args:
+        queue (WorkQueue): Queue backend shared with the coordinator.
+        worker_id (str, optional): Name stored in leases (defaults to host and process id).
+        lease_seconds (float): Time after which an unfinished shard can be claimed again.
+        max_workers (int, optional): Threads used to render a shard.
+        poll_interval (float): Seconds between checks while waiting for the job or other workers.
+        timeout (float, optional): Maximum time to wait for a job to be submitted, in seconds.
+    Returns:
+        int: Number of shards rendered by this worker.
+    Raises:
+        TimeoutError: If no job is submitted in time.
+    """
+    if worker_id is None:
+        worker_id = f"{socket.gethostname()}-{os.getpid()}"
+    deadline = None if timeout is None else time.time() + timeout
+    options = queue.get_options()
+    while options is None:
+        if deadline is not None and time.time() > deadline:
+            raise TimeoutError("No job was submitted to the queue.")
+        time.sleep(poll_interval)
+        options = queue.get_options()
+    rendered = 0
+    while True:
+        shard = queue.claim(worker_id, lease_seconds)
+        if shard is None:
+            if queue.pending() == 0:
+                return rendered
+            time.sleep(poll_interval)
+            continue
+        shard_id, attempt, items = shard
+        try:
+            results = _render_shard(items, options, max_workers)
+        except BaseException:
+            # Let another worker retry the shard right away
+            queue.release(shard_id, attempt)
+            raise
+        queue.complete(shard_id, attempt, results)
+        rendered += 1
+
+
+def _restore_geometry(result):
+    """Turn the coordinate lists of JSON geometry data back into tuples, as in quick_geometry."""
+    for edge in result.get('edges', []):
+        for key in ('start', 'end', 'label_pos'):
+            if key in edge:
+                edge[key] = tuple(edge[key])
+    return result
+
+
+def collect_results(queue, wait=True, poll_interval=1.0, timeout=None):
+    """
+    Merge the results of every shard in input order (coordinator side).
+    Args:
+        queue (WorkQueue): Queue backend holding the job.
+        wait (bool): If True, wait until every shard is finished.
+        poll_interval (float): Seconds between checks while waiting.
+        timeout (float, optional): Maximum time to wait, in seconds.
+    Returns:
+        list: One result per reaction, in the order given to submit_batch.
+    Raises:
+        TimeoutError: If the job is not finished in time.
+        RuntimeError: If wait is False and shards are still pending.
+    """
+    deadline = None if timeout is None else time.time() + timeout
+    while queue.pending():
+        if not wait:
+            raise RuntimeError(f"{queue.pending()} shard(s) are still pending.")
+        if deadline is not None and time.time() > deadline:
+            raise TimeoutError(f"{queue.pending()} shard(s) are still pending.")
+        time.sleep(poll_interval)
+
+    merged = [result for shard in queue.results() for result in shard]
+    if queue.get_options()['mode'] == 'geometry':
+        merged = [_restore_geometry(result) for result in merged]
+    return merged
+
+
+if __name__ == '__main__':
+    # python -m pyfeyngen.distributed /shared/job/directory
+    if len(sys.argv) != 2:
+        sys.exit("Usage: python -m pyfeyngen.distributed <job directory>\n"
+                 "Workers can start before submit_batch: they wait until the job is submitted.")
+    print(f"{run_worker(FileQueue(sys.argv[1]))} shard(s) rendered.")
@@ -8,4 +8,8 @@ class InvalidReactionError(FeyngenError):
 
 class UnknownParticleError(FeyngenError):
     """A particle is not defined in physics.py."""
-    pass
\ No newline at end of file
+    pass
+
+class UnboundPlaceholderError(FeyngenError):
+    """A template placeholder has no value in the bindings."""
+    pass
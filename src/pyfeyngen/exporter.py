@@ -1,12 +1,27 @@
+import math
 from .physics import get_info
 
-def generate_physical_tikz(graph, user_dict=None):
+def _vertex_attr(graph, vertex):
+    """
+    Build the [style, label=...] attribute of a vertex, or an empty string if it has none.
+    """
+    options = []
+    if vertex in graph.vertex_styles:
+        options.append(graph.vertex_styles[vertex])
+    label = getattr(graph, 'vertex_labels', {}).get(vertex)
+    if label:
+        options.append(f"label={{{label}}}")
+    return f"[{', '.join(options)}]" if options else ""
+
+def generate_physical_tikz(graph, user_dict=None, placements=None):
     """
     Generate a TikZ diagram for a Feynman graph using the feynmandiagram package.
     Handles vertex styles, edge bending, and particle labels for physical clarity.
     Args:
         graph: The FeynmanGraph object containing nodes, edges, and styles.
         user_dict (dict, optional): Custom particle info dictionary.
+        placements (list, optional): Label sides and bends per edge, from
+            LayeredLayout.get_label_placements. Without it, label sides alternate per vertex.
     Returns:
         str: TikZ code for the Feynman diagram.
     """
@@ -18,32 +33,37 @@ def generate_physical_tikz(graph, user_dict=None):
     # 1. Pre-filter edges and count total lines between each pair
     path_totals = {}
     valid_edges = []
-    for edge in graph.edges:
+    for index, edge in enumerate(graph.edges):
         src, dst, particle = edge
         if isinstance(particle, str):
-            valid_edges.append(edge)
+            valid_edges.append((index, edge))
             path_id = tuple(sorted((src, dst)))
             path_totals[path_id] = path_totals.get(path_id, 0) + 1
 
     path_current_count = {}
 
     # 2. Generate TikZ lines for each edge
-    for src, dst, particle in valid_edges:
+    for index, (src, dst, particle) in valid_edges:
         info = get_info(particle, user_dict)
         style = info['style']
         label = info['label']
         path_id = tuple(sorted((src, dst)))
+        placement = placements[index] if placements is not None else None
+        # Anti-fermions are drawn from dst to src, which swaps left and right
+        reversed_line = info['is_anti'] and style == 'fermion'
 
         # --- Vertex style management (inject style only once per vertex) ---
         src_attr = ""
-        if src in graph.vertex_styles and src not in styled_vertices:
-            src_attr = f"[{graph.vertex_styles[src]}]"
-            styled_vertices.add(src)
+        if src not in styled_vertices:
+            src_attr = _vertex_attr(graph, src)
+            if src_attr:
+                styled_vertices.add(src)
 
         dst_attr = ""
-        if dst in graph.vertex_styles and dst not in styled_vertices:
-            dst_attr = f"[{graph.vertex_styles[dst]}]"
-            styled_vertices.add(dst)
+        if dst not in styled_vertices:
+            dst_attr = _vertex_attr(graph, dst)
+            if dst_attr:
+                styled_vertices.add(dst)
 
         # --- Multi-bending management for multiple edges between same nodes ---
         bend_style = ""
@@ -54,17 +74,24 @@ def generate_physical_tikz(graph, user_dict=None):
             max_bend = 50  # Maximum bend angle in degrees
             step = (max_bend * 2) / (total_lines - 1)
             angle = -max_bend + (step * idx)
+            # Follow the bend side chosen by the label placement
+            if placement is not None and placement['bend']:
+                angle = math.copysign(angle, placement['bend'])
             # Reverse angle for anti-fermions
-            if info['is_anti'] and style == 'fermion':
+            if reversed_line:
                 angle = -angle
             if abs(angle) > 0.1:
                 side = "left" if angle > 0 else "right"
                 bend_style = f"bend {side}={abs(int(angle))}"
 
         # --- Label side management (alternate label position for clarity) ---
-        count_usage = vertex_usage.get(src, 0)
-        label_side = "'" if count_usage % 2 != 0 else ""
-        vertex_usage[src] = count_usage + 1
+        if placement is not None:
+            left = (placement['label_side'] > 0) != reversed_line
+            label_side = "" if left else "'"
+        else:
+            count_usage = vertex_usage.get(src, 0)
+            label_side = "'" if count_usage % 2 != 0 else ""
+            vertex_usage[src] = count_usage + 1
 
         # --- Edge options construction (style, bend, label) ---
         label_cmd = fr"edge label{label_side}=\({label}\)" if label else ""
@@ -77,7 +104,7 @@ def generate_physical_tikz(graph, user_dict=None):
 
         # --- Final assembly (unique vertex[style] syntax) ---
         # Reverse direction for anti-fermions
-        if info['is_anti'] and style == 'fermion':
+        if reversed_line:
             line = fr"  {dst}{dst_attr} -- [{options_str}] {src}{src_attr}"
         else:
             line = fr"  {src}{src_attr} -- [{options_str}] {dst}{dst_attr}"
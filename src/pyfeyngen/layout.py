@@ -20,6 +20,8 @@ class FeynmanGraph:
         self.anchor_points = {} 
         # Stores vertex styles (e.g., { "vx1": "blob" })
         self.vertex_styles = {}
+        # Stores vertex labels (e.g., the summary of a collapsed blob)
+        self.vertex_labels = {}
         # Build the graph from the provided structure
         self.build_graph(structure)
 
@@ -49,7 +51,8 @@ class FeynmanGraph:
         Args:
             structure (list): Parsed reaction structure from the parser.
         """
-        first_step = structure[0]
+        steps = self._iter_steps(structure)
+        first_step = next(steps)
 
         # Extract input particles, anchors, and cascades from the first step
         in_particles = [p for p in first_step if isinstance(p, (str, dict)) and 'anchor' not in str(p) and 'loop' not in str(p) and 'cascade' not in str(p)]
@@ -65,7 +68,7 @@ class FeynmanGraph:
                 p_name = p['name'] if isinstance(p, dict) else p
                 in_node = self.new_in()
                 self.edges.append((in_node, v_start, p_name))
-            self._process_steps(v_start, structure[1:])
+            self._process_steps(v_start, steps)
 
         elif in_cascades:
             # Handle cascades (nested reactions)
@@ -77,92 +80,113 @@ class FeynmanGraph:
                 if isinstance(item, dict) and item.get('style') == 'blob':
                     self.vertex_styles[v_root] = 'blob'
 
-                p_start = cascade[0][0]
+                cascade_steps = self._iter_steps(cascade)
+                cascade_start = next(cascade_steps)
+                p_start = cascade_start[0]
                 p_name = p_start['name'] if isinstance(p_start, dict) else p_start
 
                 in_node = self.new_in()
                 self.edges.append((in_node, v_root, p_name))
 
                 # Register anchors in the cascade
-                for t in cascade[0]:
+                for t in cascade_start:
                     if isinstance(t, dict) and 'anchor' in t:
                         self._register_anchor(v_root, t)
-                self._process_steps(v_root, cascade[1:])
+                self._process_steps(v_root, cascade_steps)
 
         # Connect all anchors at the end
         self._connect_anchors()
 
 
+    def _iter_steps(self, steps):
+        """
+        Yield the steps of a parsed structure one by one, expanding repetitions
+        ({'repeat': steps, 'count': n}) lazily so they are never copied.
+        Args:
+            steps (list): Parsed steps, possibly containing repetitions.
+        """
+        for step in steps:
+            if len(step) == 1 and isinstance(step[0], dict) and 'repeat' in step[0]:
+                for _ in range(step[0]['count']):
+                    yield from self._iter_steps(step[0]['repeat'])
+            else:
+                yield step
+
+
     def _process_steps(self, current_v, steps):
         """
-        Recursively process each step in the reaction structure, building edges and handling
-        anchors, loops, cascades, and final particles.
+        Process each step in the reaction structure, building edges and handling
+        anchors, loops, cascades, and final particles. Steps are consumed one at a time
+        so long chains cost neither recursion depth nor copies.
         Args:
             current_v (str): The current vertex being processed.
-            steps (list): Remaining steps to process.
+            steps (iterator): Remaining steps to process, as yielded by _iter_steps.
         """
-        if not steps:
-            return
-        step = steps[0]
-
-        # Extract anchors, loops, and particles from the step
-        anchors = [item for item in step if isinstance(item, dict) and 'anchor' in item]
-        loops = [item for item in step if isinstance(item, dict) and 'loop' in item]
-        # Capture anything that can be a particle (str, style dict, or cascade)
-        particles = [item for item in step if isinstance(item, (str, list)) or (isinstance(item, dict) and 'anchor' not in item and 'loop' not in item)]
-
-        # Register anchors and detect blob style
-        for a in anchors:
-            self._register_anchor(current_v, a)
-
-        for item in step:
-            if isinstance(item, dict) and item.get('style') == 'blob':
-                self.vertex_styles[current_v] = 'blob'
-
-        # Handle loops (multi-particle bends)
-        if loops:
-            loop_data = loops[0]
-            v_loop_end = self.new_v()
-            if loop_data.get('style') == 'blob':
-                self.vertex_styles[v_loop_end] = 'blob'
-            for p in loop_data['loop']:
-                self.edges.append((current_v, v_loop_end, p))
-            self._process_steps(v_loop_end, steps[1:])
-            return
-
-        if not particles:
-            self._process_steps(current_v, steps[1:])
-            return
-
-        # Handle particles (outputs or propagation)
-        # If this is the last step or there are multiple particles, treat as outputs/branches
-        if len(steps) == 1 or len(particles) > 1:
-            for item in particles:
-                if isinstance(item, (list, dict)) and ('cascade' in str(item) or isinstance(item, list)):
-                    # This is a cascade (nested reaction)
-                    cascade = item['cascade'] if isinstance(item, dict) else item
-                    v_branch = self.new_v()
-                    if isinstance(item, dict) and item.get('style') == 'blob':
-                        self.vertex_styles[v_branch] = 'blob'
-
-                    # Take the bridge particle
-                    p_start = cascade[0][0]
-                    p_name = p_start['name'] if isinstance(p_start, dict) else p_start
-                    self.edges.append((current_v, v_branch, p_name))
-                    self._process_steps(v_branch, cascade[1:])
-                else:
-                    # This is a final particle (output)
-                    p_name = item['name'] if isinstance(item, dict) else item
-                    f_node = self.new_f()
-                    self.edges.append((current_v, f_node, p_name))
-
-        # If there is only one particle and more steps, propagate to next vertex
-        else:
-            item = particles[0]
-            p_name = item['name'] if isinstance(item, dict) else item
-            v_next = self.new_v()
-            self.edges.append((current_v, v_next, p_name))
-            self._process_steps(v_next, steps[1:])
+        step = next(steps, None)
+        while step is not None:
+            # Look ahead one step to know whether this is the last one
+            next_step = next(steps, None)
+
+            # Extract anchors, loops, and particles from the step
+            anchors = [item for item in step if isinstance(item, dict) and 'anchor' in item]
+            loops = [item for item in step if isinstance(item, dict) and 'loop' in item]
+            # Capture anything that can be a particle (str, style dict, or cascade)
+            particles = [item for item in step if isinstance(item, (str, list)) or (isinstance(item, dict) and 'anchor' not in item and 'loop' not in item)]
+
+            # Register anchors and detect blob style
+            for a in anchors:
+                self._register_anchor(current_v, a)
+
+            for item in step:
+                if isinstance(item, dict) and item.get('style') == 'blob':
+                    self.vertex_styles[current_v] = 'blob'
+
+            # Handle loops (multi-particle bends)
+            if loops:
+                loop_data = loops[0]
+                v_loop_end = self.new_v()
+                if loop_data.get('style') == 'blob':
+                    self.vertex_styles[v_loop_end] = 'blob'
+                for p in loop_data['loop']:
+                    self.edges.append((current_v, v_loop_end, p))
+                current_v = v_loop_end
+
+            elif not particles:
+                pass
+
+            # Handle particles (outputs or propagation)
+            # If this is the last step or there are multiple particles, treat as outputs/branches
+            elif next_step is None or len(particles) > 1:
+                for item in particles:
+                    if isinstance(item, (list, dict)) and ('cascade' in str(item) or isinstance(item, list)):
+                        # This is a cascade (nested reaction)
+                        cascade = item['cascade'] if isinstance(item, dict) else item
+                        v_branch = self.new_v()
+                        if isinstance(item, dict) and item.get('style') == 'blob':
+                            self.vertex_styles[v_branch] = 'blob'
+
+                        # Take the bridge particle
+                        cascade_steps = self._iter_steps(cascade)
+                        p_start = next(cascade_steps)[0]
+                        p_name = p_start['name'] if isinstance(p_start, dict) else p_start
+                        self.edges.append((current_v, v_branch, p_name))
+                        self._process_steps(v_branch, cascade_steps)
+                    else:
+                        # This is a final particle (output)
+                        p_name = item['name'] if isinstance(item, dict) else item
+                        f_node = self.new_f()
+                        self.edges.append((current_v, f_node, p_name))
+                return
+
+            # If there is only one particle and more steps, propagate to next vertex
+            else:
+                item = particles[0]
+                p_name = item['name'] if isinstance(item, dict) else item
+                v_next = self.new_v()
+                self.edges.append((current_v, v_next, p_name))
+                current_v = v_next
+
+            step = next_step
 
 
     def _register_anchor(self, vertex, anchor_dict):
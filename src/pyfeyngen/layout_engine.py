@@ -1,3 +1,5 @@
+from .placement import place_labels as _place_labels
+
 
 class LayeredLayout:
     """
@@ -23,34 +25,48 @@ class LayeredLayout:
         Returns:
             dict: Mapping from node_id to column index.
         """
-        columns = {}
-        # Identify all nodes present in edges and add to the set
-        all_nodes = set(self.graph.nodes)
-        all_targets = set()
-        for e in self.graph.edges:
-            all_nodes.add(e[0])
-            all_nodes.add(e[1])
-            all_targets.add(e[1])
+        # Identify all nodes present in edges and build adjacency (self-loops do not affect columns).
+        # Nodes are kept in first-appearance order (a dict, not a set) so the layout does not
+        # depend on the hash seed of the process.
+        all_nodes = dict.fromkeys(self.graph.nodes)
+        children = {}
+        in_degree = {}
+        for src, dst, _ in self.graph.edges:
+            all_nodes.setdefault(src)
+            all_nodes.setdefault(dst)
+            if src != dst:
+                children.setdefault(src, []).append(dst)
+                in_degree[dst] = in_degree.get(dst, 0) + 1
 
         # Sources are nodes that are never targets (i.e., have no incoming edges)
-        sources = [n for n in all_nodes if n not in all_targets]
+        sources = [n for n in all_nodes if n not in in_degree]
 
         # If no sources (circular graph), pick the first node
         if not sources and all_nodes:
-            sources = [list(all_nodes)[0]]
-
-        # Breadth-first assignment of columns
-        queue = [(n, 0) for n in sources]
-        while queue:
-            node_id, col = queue.pop(0)
-            columns[node_id] = max(columns.get(node_id, 0), col)
-
-            # Children: nodes that are targets of outgoing edges
-            children = [e[1] for e in self.graph.edges if e[0] == node_id]
-            for child in children:
-                # Avoid infinite loops by only updating if new column is greater
-                if columns.get(child, -1) < col + 1:
-                    queue.append((child, col + 1))
+            sources = [next(iter(all_nodes))]
+
+        # Breadth-first visit order, which fixes the order of nodes inside each column
+        order = list(sources)
+        visited = set(sources)
+        for node_id in order:
+            for child in children.get(node_id, ()):
+                if child not in visited:
+                    visited.add(child)
+                    order.append(child)
+
+        # Column = longest distance from a source, in topological order (linear time)
+        longest = {n: 0 for n in sources}
+        remaining = dict(in_degree)
+        ready = list(sources)
+        while ready:
+            node_id = ready.pop()
+            for child in children.get(node_id, ()):
+                longest[child] = max(longest.get(child, 0), longest[node_id] + 1)
+                remaining[child] -= 1
+                if remaining[child] == 0:
+                    ready.append(child)
+
+        columns = {node_id: longest.get(node_id, 0) for node_id in order}
 
         # Assign column 0 to any remaining unassigned nodes (safety)
         for node_id in all_nodes:
@@ -87,9 +103,13 @@ class LayeredLayout:
 
         return self.positions
 
-    def get_inkscape_data(self):
+    def get_inkscape_data(self, user_dict=None, place_labels=False):
         """
         Generate node and edge geometry for Inkscape or other visualization tools.
+        Args:
+            user_dict (dict, optional): Custom particle info dictionary (labels and styles).
+            place_labels (bool): If True, choose label positions and bend signs that avoid
+                collisions, and add 'label_side' and 'label_pos' to each edge.
         Returns:
             dict: Contains 'nodes' (positions and styles) and 'edges' (geometry and labels).
         """
@@ -105,6 +125,9 @@ class LayeredLayout:
                 "y": pos[1],
                 "style": v_style
             }
+            v_label = getattr(self.graph, 'vertex_labels', {}).get(node_id)
+            if v_label:
+                node_data[node_id]["label"] = v_label
 
         # 2. Count edges between each pair for curve distribution
         edge_counts = {}
@@ -122,7 +145,7 @@ class LayeredLayout:
             current_idx = processed_pairs.get(pair, 0) + 1
             processed_pairs[pair] = current_idx
 
-            info = get_info(particle_name)
+            info = get_info(particle_name, user_dict)
             total_edges = edge_counts[pair]
 
             is_curved = total_edges > 1
@@ -147,4 +170,20 @@ class LayeredLayout:
                 "bend": round(bend_value, 2)
             })
 
-        return {"nodes": node_data, "edges": geometry_edges}
\ No newline at end of file
+        # 3. Choose label positions and bend signs that avoid collisions
+        if place_labels:
+            _place_labels(node_data, geometry_edges, min(self.x_spacing, self.y_spacing) / 2)
+
+        return {"nodes": node_data, "edges": geometry_edges}
+
+    def get_label_placements(self, user_dict=None):
+        """
+        Return the label side and bend chosen for each edge, in the order of graph.edges.
+        Used by generate_physical_tikz to reflect the placement in the TikZ output.
+        Args:
+            user_dict (dict, optional): Custom particle info dictionary, so label boxes match the rendered labels.
+        Returns:
+            list: Dictionaries with 'label_side' (1 = left of the edge direction, -1 = right) and 'bend'.
+        """
+        edges = self.get_inkscape_data(user_dict, place_labels=True)["edges"]
+        return [{"label_side": e["label_side"], "bend": e["bend"]} for e in edges]
\ No newline at end of file
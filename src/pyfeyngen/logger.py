@@ -1,12 +1,53 @@
 import logging
+import threading
+from contextlib import contextmanager
 logger = logging.getLogger('pyfeyngen')
+# Serializes logger configuration when renders run on several threads
+_setup_lock = threading.Lock()
+# Per-thread flag set while a render called with debug=True is running
+_local = threading.local()
+def _add_handler():
+    with _setup_lock:
+        if not logger.hasHandlers():
+            handler = logging.StreamHandler()
+            formatter = logging.Formatter('%(levelname)s - %(name)s - %(message)s')
+            handler.setFormatter(formatter)
+            logger.addHandler(handler)
 def setup_logging(debug=False):
     level = logging.DEBUG if debug else logging.INFO
-    if not logger.hasHandlers():
-        handler = logging.StreamHandler()
-        formatter = logging.Formatter('%(levelname)s - %(name)s - %(message)s')
-        handler.setFormatter(formatter)
-        logger.addHandler(handler)
-    logger.setLevel(level)
+    _add_handler()
+    with _setup_lock:
+        # Only touch the shared logger when the level actually changes
+        if logger.level == level:
+            return
+        logger.setLevel(level)
     if debug:
-        logger.debug("DEBUG mode enabled")
\ No newline at end of file
+        logger.debug("DEBUG mode enabled")
+@contextmanager
+def debug_output(enabled=True):
+    """
+    Emit the debug messages of the current thread while the block runs, without changing
+    the shared logger level (other threads and later renders are not affected).
+    Args:
+        enabled (bool): If False, the block runs unchanged.
+    """
+    if not enabled:
+        yield
+        return
+    _add_handler()
+    previous = getattr(_local, 'debug', False)
+    _local.debug = True
+    try:
+        yield
+    finally:
+        _local.debug = previous
+class _RenderLogger(logging.LoggerAdapter):
+    """Logger adapter whose debug messages go out when the current thread is inside debug_output."""
+    def log(self, level, msg, *args, **kwargs):
+        if level == logging.DEBUG and getattr(_local, 'debug', False) and not self.logger.isEnabledFor(level):
+            msg, kwargs = self.process(msg, kwargs)
+            self.logger.handle(self.logger.makeRecord(self.logger.name, level, '(pyfeyngen)', 0, msg, args, None))
+        else:
+            super().log(level, msg, *args, **kwargs)
+# Logger used during renders
+render_logger = _RenderLogger(logger, {})
@@ -1,15 +1,26 @@
+import re
 from .errors import InvalidReactionError
 
+# Macro definition: "let NAME = body"
+_MACRO_DEF = re.compile(r"^\s*let\s+([A-Za-z_][A-Za-z0-9_]*)\s*=(.*)$", re.S)
+# Repetition count following '>^' or ')*'
+_REPEAT_COUNT = re.compile(r"\s*(\d+)")
+
+
 def parse_reaction(reaction_str):
     """
     Parse a reaction string into a nested list structure.
-    Supports branching (...), multi-particle loops [...], anchors @, and style attributes {...}.
+    Supports branching (...), multi-particle loops [...], anchors @, style attributes {...},
+    repetition ((...)*n and >^n) and macros (let NAME = ...; reaction).
+    Repetitions and macros are not expanded here: they are kept as shared sub-structures
+    ({'repeat': steps, 'count': n}) that FeynmanGraph expands lazily while building the graph.
     Args:
         reaction_str (str): The reaction string to parse.
     Returns:
         list: Nested list structure representing the parsed reaction.
     Raises:
-        InvalidReactionError: If the input string is empty or delimiters are unbalanced.
+        InvalidReactionError: If the input string is empty, delimiters are unbalanced,
+            or a repetition/macro is malformed.
     """
     if not reaction_str.strip():
         raise InvalidReactionError("Reaction string is empty.")
@@ -21,38 +32,135 @@ def parse_reaction(reaction_str):
     if reaction_str.count('{') != reaction_str.count('}'):
         raise InvalidReactionError("Unbalanced braces.")
 
-    s = reaction_str.strip()
+    # Macro definitions come first, separated from the reaction by ';'
+    *definitions, reaction = reaction_str.split(';')
+    macros = {}
+    for definition in definitions:
+        _define_macro(definition, macros)
+
+    return _parse_chain(reaction, macros)
+
+
+def _define_macro(definition, macros):
+    """
+    Parse a 'let NAME = body' statement and store the parsed body in macros.
+    A single-step body expands to its tokens; a multi-step body expands to a chain segment.
+    Args:
+        definition (str): The macro definition statement.
+        macros (dict): Known macros, updated in place.
+    """
+    match = _MACRO_DEF.match(definition)
+    if not match:
+        raise InvalidReactionError(f"Invalid macro definition: '{definition.strip()}'.")
+    name, body = match.groups()
+    chain = _parse_chain(body, macros)
+    if len(chain) == 1:
+        macros[name] = chain[0]
+    else:
+        macros[name] = [{'repeat': chain, 'count': 1}]
+
+
+def _read_count(s, i):
+    """
+    Read a repetition count starting at index i.
+    Returns:
+        tuple: (count, index just after the count).
+    """
+    match = _REPEAT_COUNT.match(s, i)
+    if not match:
+        raise InvalidReactionError("Expected a repetition count.")
+    count = int(match.group(1))
+    if count < 1:
+        raise InvalidReactionError("Repetition count must be a positive integer.")
+    return count, match.end()
+
+
+def _parse_chain(chain_str, macros):
+    """
+    Split a chain of steps on top-level '>' (or '>^n') and parse each step.
+    Args:
+        chain_str (str): The chain string (no macro definitions).
+        macros (dict): Known macros.
+    Returns:
+        list: List of parsed steps.
+    """
+    s = chain_str.strip()
+    if not s:
+        raise InvalidReactionError("Reaction string is empty.")
     steps = []
     current_step = ""
     depth = 0
 
     # Split the reaction string by top-level '>' (not inside parentheses)
-    for char in s:
+    i = 0
+    while i < len(s):
+        char = s[i]
         if char == '(': depth += 1
         elif char == ')': depth -= 1
 
         if char == '>' and depth == 0:
-            steps.append(current_step.strip())
+            count = 1
+            i += 1
+            # '>^n' repeats the preceding step n times
+            if s.startswith('^', i):
+                count, i = _read_count(s, i + 1)
+            steps.append((current_step.strip(), count))
             current_step = ""
         else:
             current_step += char
-    steps.append(current_step.strip())
+            i += 1
+    steps.append((current_step.strip(), 1))
 
     final_structure = []
-    for step in steps:
+    for step, count in steps:
         if step:
-            final_structure.append(_parse_step(step))
-        
+            parsed = _parse_step(step, macros)
+            if count > 1:
+                parsed = [{'repeat': [parsed], 'count': count}]
+            final_structure.append(parsed)
+        elif count > 1:
+            raise InvalidReactionError("'>^' must follow a step.")
+
+    # A step with several particles ends the chain: inside a repetition it would drop the rest
+    for index, step in enumerate(final_structure):
+        if _is_repeat(step):
+            segment, count = step[0]['repeat'], step[0]['count']
+            if any(_ends_chain(s) for s in segment[:-1]) or (
+                    _ends_chain(segment[-1]) and (count > 1 or index < len(final_structure) - 1)):
+                raise InvalidReactionError("A repeated segment cannot continue after a step with several particles.")
+
     return final_structure
 
-def _parse_step(step_str):
+
+def _is_repeat(step):
+    """Return True if a parsed step is a repetition ({'repeat': steps, 'count': n})."""
+    return len(step) == 1 and isinstance(step[0], dict) and 'repeat' in step[0]
+
+
+def _ends_chain(step):
+    """
+    Return True if a parsed step ends its chain when the graph is built,
+    i.e. it has several particles (or is a repetition ending with such a step).
+    """
+    if _is_repeat(step):
+        return _ends_chain(step[0]['repeat'][-1])
+    if any(isinstance(t, dict) and 'loop' in t for t in step):
+        return False
+    particles = [t for t in step if not (isinstance(t, dict) and 'anchor' in t)]
+    return len(particles) > 1
+
+
+def _parse_step(step_str, macros=None):
     """
     Analyze a step to separate particles, cascades (parentheses), loops (brackets), anchors (@), and styles (braces).
     Args:
         step_str (str): The step string to analyze.
+        macros (dict, optional): Known macros, expanded by reference.
     Returns:
         list: List of tokens representing the parsed step.
     """
+    if macros is None:
+        macros = {}
     tokens = []
     i = 0
     while i < len(step_str):
@@ -71,7 +179,13 @@ def _parse_step(step_str):
                 elif step_str[i] == ')': depth -= 1
                 i += 1
             # Recursively parse the content inside parentheses
-            tokens.append(parse_reaction(step_str[start:i-1]))
+            sub_chain = _parse_chain(step_str[start:i-1], macros)
+            # '(...)*n' is a chain segment repeated n times
+            if step_str.startswith('*', i):
+                count, i = _read_count(step_str, i + 1)
+                tokens.append({'repeat': sub_chain, 'count': count})
+            else:
+                tokens.append(sub_chain)
 
         # 2. Handle brackets for loops (multi-particle bends)
         elif step_str[i] == '[':
@@ -110,25 +224,34 @@ def _parse_step(step_str):
                 i += 1
             attr_content = step_str[start:i-1].strip()
 
-            # Apply the attribute to the last added element
+            # Apply the attribute to the last added element (copied, it may be shared by a macro)
             if tokens:
                 last_item = tokens[-1]
+                if isinstance(last_item, dict) and 'repeat' in last_item:
+                    # A repetition stands for whole steps, there is no single vertex to style
+                    raise InvalidReactionError("A style cannot be applied to a repetition (...)*n.")
                 if isinstance(last_item, dict):
-                    last_item['style'] = attr_content
+                    tokens[-1] = dict(last_item, style=attr_content)
                 elif isinstance(last_item, str):
                     tokens[-1] = {'name': last_item, 'style': attr_content}
                 elif isinstance(last_item, list):
                     tokens[-1] = {'cascade': last_item, 'style': attr_content}
             continue  # Do not increment i twice
 
-        # 5. Handle particle names (default case)
+        # 5. Handle particle names and macro references (default case)
         else:
             start = i
             # Stop at whitespace or any opening delimiter
             while i < len(step_str) and not step_str[i].isspace() and step_str[i] not in '([@{':
                 i += 1
             token = step_str[start:i]
-            if token:
+            if token in macros:
+                tokens.extend(macros[token])
+            elif token:
                 tokens.append(token)
 
-    return tokens
\ No newline at end of file
+    # A repeated chain segment stands for whole steps, it cannot share a step
+    if len(tokens) > 1 and any(isinstance(t, dict) and 'repeat' in t for t in tokens):
+        raise InvalidReactionError("A repetition (...)*n must be alone in its step.")
+
+    return tokens
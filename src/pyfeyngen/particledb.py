@@ -0,0 +1,187 @@
+import mmap
+import os
+import struct
+import threading
+
+# File layout: header, sorted index of record offsets, then records.
+# Each record is "name␟style␟label␟is_anti␟antiparticle␟charge\n", sorted by UTF-8 name.
+MAGIC = b'PFDB'
+VERSION = 1
+HEADER = struct.Struct('<4sII')  # magic, version, number of records
+OFFSET = struct.Struct('<I')
+FIELD_SEP = b'\x1f'
+RECORD_END = b'\n'
+
+DEFAULT_PATH = os.path.join(os.path.dirname(__file__), 'data', 'particles.pfdb')
+
+
+class ParticleDatabase:
+    """
+    Read-only particle table stored in a packed, sorted file and memory-mapped.
+    Lookups are binary searches over the mapped index, so only the touched pages are loaded.
+    """
+    def __init__(self, path):
+        """
+        Open a particle database file.
+        Args:
+            path (str): Path to a file written by write_particle_database.
+        Raises:
+            ValueError: If the file is not a particle database.
+        """
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, count = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            self._mm.close()
+            raise ValueError(f"'{path}' is not a pyfeyngen particle database.")
+        self.count = count
+        self._index = HEADER.size
+        self._data = HEADER.size + OFFSET.size * count
+
+    def __len__(self):
+        return self.count
+
+    def __contains__(self, name):
+        return self._find(name) is not None
+
+    def _start(self, i):
+        """Return the file position of record i."""
+        return self._data + OFFSET.unpack_from(self._mm, self._index + OFFSET.size * i)[0]
+
+    def _name(self, i):
+        start = self._start(i)
+        return self._mm[start:self._mm.find(FIELD_SEP, start)]
+
+    def _find(self, name):
+        """Binary search for a name. Returns the record index or None."""
+        key = name.encode('utf-8')
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._name(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self.count and self._name(lo) == key:
+            return lo
+        return None
+
+    def lookup(self, name):
+        """
+        Look up a particle by name.
+        Args:
+            name (str): The particle name.
+        Returns:
+            dict or None: Dictionary with keys 'style', 'label', 'is_anti', 'antiparticle'
+                and 'charge', or None if the name is unknown.
+        """
+        i = self._find(name)
+        if i is None:
+            return None
+        start = self._start(i)
+        record = self._mm[start:self._mm.find(RECORD_END, start)].decode('utf-8')
+        _, style, label, is_anti, antiparticle, charge = record.split('\x1f')
+        return {
+            'style': style,
+            'label': label,
+            'is_anti': is_anti == '1',
+            'antiparticle': antiparticle or None,
+            'charge': _parse_charge(charge),
+        }
+
+    def close(self):
+        self._mm.close()
+
+
+def _parse_charge(text):
+    """Convert a charge written as a number or a fraction (e.g. "-1/3") to a float."""
+    numerator, _, denominator = text.partition('/')
+    return float(numerator) / float(denominator or 1)
+
+
+def write_particle_database(entries, path):
+    """
+    Write a particle table to the packed on-disk format (see build_particledb to convert a CSV file).
+    Args:
+        entries (dict): Mapping from particle name to a dictionary with 'style', 'label',
+            'is_anti' and optionally 'antiparticle' and 'charge' (number or fraction string, e.g. "-1/3").
+        path (str): Output file path.
+    """
+    names = sorted(entries, key=lambda n: n.encode('utf-8'))
+    records = []
+    for name in names:
+        info = entries[name]
+        fields = [
+            name,
+            info['style'],
+            info['label'],
+            '1' if info.get('is_anti') else '0',
+            info.get('antiparticle') or '',
+            str(info.get('charge', 0)).strip(),
+        ]
+        _parse_charge(fields[5])
+        for field in fields:
+            if '\x1f' in field or '\n' in field:
+                raise ValueError(f"Invalid character in the definition of '{name}'.")
+        records.append('\x1f'.join(fields).encode('utf-8') + RECORD_END)
+
+    offsets = []
+    position = 0
+    for record in records:
+        offsets.append(position)
+        position += len(record)
+
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(records)))
+        for offset in offsets:
+            f.write(OFFSET.pack(offset))
+        for record in records:
+            f.write(record)
+
+
+# Database used by physics.get_info, opened on the first lookup
+_database = None
+_database_path = DEFAULT_PATH
+_database_lock = threading.Lock()
+
+
+def set_particle_database(path):
+    """
+    Select the particle database used after the built-in PARTICLES (e.g. a full PDG table).
+    The file is only opened on the next lookup.
+    Args:
+        path (str or None): Database file path, or None to disable the database.
+    """
+    global _database, _database_path
+    with _database_lock:
+        # The previous table is not closed: other threads may still be reading it
+        _database = None
+        _database_path = path
+
+
+def lookup(name):
+    """
+    Look up a particle in the selected database, opening it on first use.
+    Args:
+        name (str): The particle name.
+    Returns:
+        dict or None: Particle information, or None if unknown or no database is available.
+    """
+    global _database, _database_path
+    database = _database
+    if database is None:
+        if _database_path is None:
+            return None
+        with _database_lock:
+            if _database is None and _database_path is not None:
+                if os.path.exists(_database_path):
+                    _database = ParticleDatabase(_database_path)
+                else:
+                    # Nothing to open, do not check again
+                    _database_path = None
+            database = _database
+        if database is None:
+            return None
+    return database.lookup(name)
+
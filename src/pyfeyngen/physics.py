@@ -1,32 +1,34 @@
 from .errors import UnknownParticleError  # Custom error for unknown particles
-from .logger import logger  # Logger for debug and warning messages
+from .logger import logger, render_logger  # Logger for debug and warning messages
+from . import particledb  # Full particle table, memory-mapped on first use
 import re  # Regular expressions for parsing particle names
 
 
-# Dictionary of known particles with their style, LaTeX label, and anti-particle status
+# Dictionary of known particles with their style, LaTeX label, anti-particle status,
+# antiparticle name and charge (kept consistent with data/particles.csv)
 PARTICLES = {
     # Quarks
-    'u':     {'style': 'fermion', 'label': 'u', 'is_anti': False},
-    'ubar':  {'style': 'fermion', 'label': '\\bar{u}', 'is_anti': True},
-    'd':     {'style': 'fermion', 'label': 'd', 'is_anti': False},
-    'dbar':  {'style': 'fermion', 'label': '\\bar{d}', 'is_anti': True},
-    't':     {'style': 'fermion', 'label': 't', 'is_anti': False},
-    'tbar':  {'style': 'fermion', 'label': '\\bar{t}', 'is_anti': True},
+    'u':     {'style': 'fermion', 'label': 'u', 'is_anti': False, 'antiparticle': 'ubar', 'charge': 2/3},
+    'ubar':  {'style': 'fermion', 'label': '\\bar{u}', 'is_anti': True, 'antiparticle': 'u', 'charge': -2/3},
+    'd':     {'style': 'fermion', 'label': 'd', 'is_anti': False, 'antiparticle': 'dbar', 'charge': -1/3},
+    'dbar':  {'style': 'fermion', 'label': '\\bar{d}', 'is_anti': True, 'antiparticle': 'd', 'charge': 1/3},
+    't':     {'style': 'fermion', 'label': 't', 'is_anti': False, 'antiparticle': 'tbar', 'charge': 2/3},
+    'tbar':  {'style': 'fermion', 'label': '\\bar{t}', 'is_anti': True, 'antiparticle': 't', 'charge': -2/3},
     # Leptons
-    'e-':    {'style': 'fermion', 'label': 'e^{-}', 'is_anti': False},
-    'e+':    {'style': 'fermion', 'label': 'e^{+}', 'is_anti': True},
-    'mu-':   {'style': 'fermion', 'label': '\\mu^{-}', 'is_anti': False},
-    'mu+':   {'style': 'fermion', 'label': '\\mu^{+}', 'is_anti': True},
-    'tau-':  {'style': 'fermion', 'label': '\\tau^{-}', 'is_anti': False},
-    'tau+':  {'style': 'fermion', 'label': '\\tau^{+}', 'is_anti': True},
-    'nu_e':  {'style': 'fermion', 'label': '\\nu_{e}', 'is_anti': False},
+    'e-':    {'style': 'fermion', 'label': 'e^{-}', 'is_anti': False, 'antiparticle': 'e+', 'charge': -1.0},
+    'e+':    {'style': 'fermion', 'label': 'e^{+}', 'is_anti': True, 'antiparticle': 'e-', 'charge': 1.0},
+    'mu-':   {'style': 'fermion', 'label': '\\mu^{-}', 'is_anti': False, 'antiparticle': 'mu+', 'charge': -1.0},
+    'mu+':   {'style': 'fermion', 'label': '\\mu^{+}', 'is_anti': True, 'antiparticle': 'mu-', 'charge': 1.0},
+    'tau-':  {'style': 'fermion', 'label': '\\tau^{-}', 'is_anti': False, 'antiparticle': 'tau+', 'charge': -1.0},
+    'tau+':  {'style': 'fermion', 'label': '\\tau^{+}', 'is_anti': True, 'antiparticle': 'tau-', 'charge': 1.0},
+    'nu_e':  {'style': 'fermion', 'label': '\\nu_{e}', 'is_anti': False, 'antiparticle': 'nubar_e', 'charge': 0.0},
     # Bosons
-    'Z0':    {'style': 'boson', 'label': 'Z^{0}', 'is_anti': False},
-    'W+':    {'style': 'charged boson', 'label': 'W^{+}', 'is_anti': False},
-    'W-':    {'style': 'charged boson', 'label': 'W^{-}', 'is_anti': True},
-    'gamma': {'style': 'photon', 'label': '\\gamma', 'is_anti': False},
-    'g':     {'style': 'gluon', 'label': 'g', 'is_anti': False},
-    'H':     {'style': 'scalar', 'label': 'H^{0}', 'is_anti': False}, # Style scalar = dashed or solid line
+    'Z0':    {'style': 'boson', 'label': 'Z^{0}', 'is_anti': False, 'antiparticle': 'Z0', 'charge': 0.0},
+    'W+':    {'style': 'charged boson', 'label': 'W^{+}', 'is_anti': False, 'antiparticle': 'W-', 'charge': 1.0},
+    'W-':    {'style': 'charged boson', 'label': 'W^{-}', 'is_anti': True, 'antiparticle': 'W+', 'charge': -1.0},
+    'gamma': {'style': 'photon', 'label': '\\gamma', 'is_anti': False, 'antiparticle': 'gamma', 'charge': 0.0},
+    'g':     {'style': 'gluon', 'label': 'g', 'is_anti': False, 'antiparticle': 'g', 'charge': 0.0},
+    'H':     {'style': 'scalar', 'label': 'H^{0}', 'is_anti': False, 'antiparticle': 'H', 'charge': 0.0}, # Style scalar = dashed or solid line
 }
 
 
@@ -40,24 +42,33 @@ GREEK_LETTERS = [
 
 def get_info(name, user_dict=None):
     """
-    Retrieve particle information for a given name, using user_dict or default PARTICLES.
+    Retrieve particle information for a given name, using user_dict, default PARTICLES,
+    then the full particle database (see particledb).
     If the particle is not found, attempts to parse the name and generate a LaTeX label.
     Args:
         name (str): The name of the particle.
         user_dict (dict, optional): User-supplied dictionary of particles.
     Returns:
-        dict: Dictionary with keys 'style', 'label', and 'is_anti'.
+        dict: Dictionary with keys 'style', 'label', and 'is_anti'. Known particles (PARTICLES and
+            the database) also have 'antiparticle' and 'charge'; user_dict entries and guessed
+            names may not. Always a new dictionary, so callers can modify it without touching
+            the shared definitions.
     """
     if user_dict == None:
         user_dict = {}
     # Check user-supplied dictionary first
     if name in user_dict:
-        return user_dict[name]
+        return dict(user_dict[name])
     # Check built-in PARTICLES dictionary
     elif name in PARTICLES:
-        return PARTICLES[name]
+        return dict(PARTICLES[name])
     else:
-        logger.debug(f"Particle '{name}' is not defined in the library.")
+        # Check the full particle database (opened on the first lookup)
+        info = particledb.lookup(name)
+        if info is not None:
+            return info
+
+        render_logger.debug(f"Particle '{name}' is not defined in the library.")
 
         match = re.match(r"^([a-zA-Z]+?)(bar|\+|\-|0)?(_[a-zA-Z0-9]+)?$", name)
 
@@ -0,0 +1,307 @@
+import bisect
+import math
+import re
+
+# Estimated sizes (in layout units) used to build bounding boxes
+LABEL_CHAR_WIDTH = 8
+LABEL_HEIGHT = 16
+LABEL_GAP = 4
+NODE_SIZE = 10
+BLOB_SIZE = 30
+# Width of the x strips indexing edge segments, and number of segments drawn for a curve
+STRIP_WIDTH = LABEL_CHAR_WIDTH
+CURVE_SEGMENTS = 4
+# Overlap count above which label candidates are considered equally bad
+MAX_OVERLAPS = 8
+
+
+class UniformGrid:
+    """
+    Uniform grid spatial index over axis-aligned boxes (x0, y0, x1, y1).
+    Each box is stored in every cell it covers, so queries only look at nearby boxes.
+    """
+    def __init__(self, cell_size):
+        self.cell_size = cell_size
+        self.cells = {}
+
+    def _cells(self, box):
+        """Yield the grid cells covered by a box."""
+        x0, y0, x1, y1 = box
+        c = self.cell_size
+        for i in range(math.floor(x0 / c), math.floor(x1 / c) + 1):
+            for j in range(math.floor(y0 / c), math.floor(y1 / c) + 1):
+                yield (i, j)
+
+    def insert(self, box, owner=None):
+        """
+        Add a box to the index.
+        Args:
+            box (tuple): (x0, y0, x1, y1) bounding box.
+            owner (hashable, optional): Identifier used to ignore the box in queries.
+        """
+        item = (box, owner)
+        for cell in self._cells(box):
+            self.cells.setdefault(cell, []).append(item)
+
+    def count_overlaps(self, box, ignore=None, limit=None):
+        """
+        Count the indexed boxes overlapping a box.
+        Args:
+            box (tuple): (x0, y0, x1, y1) bounding box.
+            ignore (hashable, optional): Owner whose boxes are not counted.
+            limit (int, optional): Stop counting once this number is reached.
+        Returns:
+            int: Number of overlapping boxes (at most limit).
+        """
+        x0, y0, x1, y1 = box
+        seen = set()
+        count = 0
+        for cell in self._cells(box):
+            for item in self.cells.get(cell, ()):
+                other, owner = item
+                if (ignore is not None and owner == ignore) or id(item) in seen:
+                    continue
+                seen.add(id(item))
+                if other[0] < x1 and x0 < other[2] and other[1] < y1 and y0 < other[3]:
+                    count += 1
+                    if count == limit:
+                        return count
+        return count
+
+
+class SegmentIndex:
+    """
+    Spatial index over line segments, for counting the edges crossing a box.
+    Segments are stored in narrow vertical strips with the y interval they cover there, grouped
+    by interval length and sorted, so a query only looks at the segments passing near the box.
+    A segment costs one entry per strip it spans horizontally, whatever its length along y.
+    """
+    def __init__(self, strip_width=STRIP_WIDTH):
+        self.strip_width = strip_width
+        # strip -> length class -> list of (y_low, y_high, segment, owner)
+        self.strips = {}
+        self._sorted = {}
+
+    def insert(self, start, end, owner=None):
+        """
+        Add a segment to the index.
+        Args:
+            start (tuple): (x, y) first end point.
+            end (tuple): (x, y) second end point.
+            owner (hashable, optional): Identifier used to ignore the segment in queries.
+        """
+        (x0, y0), (x1, y1) = sorted((start, end))
+        w = self.strip_width
+        for i in range(math.floor(x0 / w), math.floor(x1 / w) + 1):
+            # y interval of the segment inside strip i
+            ya, yb = _y_at(start, end, max(x0, i * w)), _y_at(start, end, min(x1, (i + 1) * w))
+            low, high = min(ya, yb), max(ya, yb)
+            length_class = max(0, math.ceil(math.log2(high - low + 1)))
+            self.strips.setdefault(i, {}).setdefault(length_class, []).append((low, high, (start, end), owner))
+        self._sorted.clear()
+
+    def _classes(self, i):
+        """Return the length classes of strip i as (class, sorted lows, entries)."""
+        if i not in self._sorted:
+            classes = []
+            for length_class, entries in self.strips.get(i, {}).items():
+                entries.sort(key=lambda e: e[0])
+                classes.append((length_class, [e[0] for e in entries], entries))
+            self._sorted[i] = classes
+        return self._sorted[i]
+
+    def count_overlaps(self, box, ignore=None, limit=None):
+        """
+        Count the indexed segments crossing a box.
+        Args:
+            box (tuple): (x0, y0, x1, y1) bounding box.
+            ignore (hashable, optional): Owner whose segments are not counted.
+            limit (int, optional): Stop counting once this number is reached.
+        Returns:
+            int: Number of crossing segments (at most limit).
+        """
+        x0, y0, x1, y1 = box
+        w = self.strip_width
+        seen = set()
+        count = 0
+        for i in range(math.floor(x0 / w), math.floor(x1 / w) + 1):
+            for length_class, lows, entries in self._classes(i):
+                # Intervals of this class are at most 2 ** length_class long
+                first = bisect.bisect_left(lows, y0 - 2 ** length_class)
+                last = bisect.bisect_right(lows, y1)
+                for low, high, segment, owner in entries[first:last]:
+                    if high < y0 or (ignore is not None and owner == ignore) or id(segment) in seen:
+                        continue
+                    seen.add(id(segment))
+                    if _segment_crosses_box(segment[0], segment[1], box):
+                        count += 1
+                        if count == limit:
+                            return count
+        return count
+
+
+def _y_at(start, end, x):
+    """Return the y coordinate of a segment at a given x (inside its x range)."""
+    if end[0] == start[0]:
+        return start[1]
+    return start[1] + (end[1] - start[1]) * (x - start[0]) / (end[0] - start[0])
+
+
+def _segment_crosses_box(start, end, box):
+    """Return True if a segment crosses an axis-aligned box (Liang-Barsky clipping)."""
+    x0, y0, x1, y1 = box
+    t0, t1 = 0.0, 1.0
+    dx, dy = end[0] - start[0], end[1] - start[1]
+    for p, q in ((-dx, start[0] - x0), (dx, x1 - start[0]), (-dy, start[1] - y0), (dy, y1 - start[1])):
+        if p == 0:
+            if q < 0:
+                return False
+        else:
+            t = q / p
+            if p < 0:
+                t0 = max(t0, t)
+            else:
+                t1 = min(t1, t)
+            if t0 > t1:
+                return False
+    return True
+
+
+def _label_size(label):
+    """Estimate the (width, height) of a LaTeX label."""
+    text = re.sub(r"\\[A-Za-z]+", "x", label or "")
+    text = re.sub(r"[{}^_\s]", "", text)
+    return LABEL_CHAR_WIDTH * max(len(text), 1), LABEL_HEIGHT
+
+
+def label_box(label, center):
+    """
+    Return the estimated bounding box of a label drawn at a position.
+    Args:
+        label (str): LaTeX label, as in the edge data.
+        center (tuple): (x, y) center of the label, e.g. the edge 'label_pos'.
+    Returns:
+        tuple: (x0, y0, x1, y1) bounding box.
+    """
+    w, h = _label_size(label)
+    return (center[0] - w / 2, center[1] - h / 2, center[0] + w / 2, center[1] + h / 2)
+
+
+def _curve_frame(start, end, bend):
+    """
+    Return the midpoint of an edge and its unit normal pointing to the visual left
+    (y axis pointing down). A curved edge is a quadratic curve whose control point lies
+    bend * length along the normal, so its midpoint is shifted by half of that.
+    """
+    dx, dy = end[0] - start[0], end[1] - start[1]
+    length = math.hypot(dx, dy)
+    if length == 0:
+        # Self-loop: place labels above the vertex
+        return start, (0.0, -1.0), 0.0
+    nx, ny = dy / length, -dx / length
+    shift = bend * length / 2
+    mid = ((start[0] + end[0]) / 2 + nx * shift, (start[1] + end[1]) / 2 + ny * shift)
+    return mid, (nx, ny), length
+
+
+def _curve_segments(start, end, bend):
+    """Split an edge into line segments: one for a straight edge, CURVE_SEGMENTS for a curve."""
+    _, (nx, ny), length = _curve_frame(start, end, bend)
+    if length == 0:
+        return []
+    if bend == 0:
+        return [(start, end)]
+    control = ((start[0] + end[0]) / 2 + nx * bend * length, (start[1] + end[1]) / 2 + ny * bend * length)
+    points = []
+    for k in range(CURVE_SEGMENTS + 1):
+        t = k / CURVE_SEGMENTS
+        a, b, c = (1 - t) ** 2, 2 * (1 - t) * t, t ** 2
+        points.append((a * start[0] + b * control[0] + c * end[0], a * start[1] + b * control[1] + c * end[1]))
+    return list(zip(points, points[1:]))
+
+
+def _label_candidates(edge, bend):
+    """
+    Yield (side, box, center) label candidates for an edge, preferred ones first.
+    side is 1 for the visual left of the start -> end direction and -1 for the right.
+    """
+    mid, (nx, ny), _ = _curve_frame(edge['start'], edge['end'], bend)
+    w, h = _label_size(edge['label'])
+    # Half extent of the label box along the normal
+    extent = abs(nx) * w / 2 + abs(ny) * h / 2
+    preferred = -1 if bend < 0 else 1
+    for distance in (1, 2, 3):
+        for side in (preferred, -preferred):
+            offset = side * (LABEL_GAP * distance + extent)
+            center = (mid[0] + nx * offset, mid[1] + ny * offset)
+            yield side, label_box(edge['label'], center), center
+
+
+def _best_label(grid, segments, edge, bend, owner):
+    """Return the (overlaps, side, box, center) of the least colliding label candidate."""
+    best = None
+    for side, box, center in _label_candidates(edge, bend):
+        # Counting beyond the best candidate so far cannot change the choice
+        limit = MAX_OVERLAPS if best is None else best[0]
+        overlaps = grid.count_overlaps(box, limit=limit)
+        if overlaps < limit:
+            overlaps += segments.count_overlaps(box, ignore=owner, limit=limit - overlaps)
+        if best is None or overlaps < best[0]:
+            best = (overlaps, side, box, center)
+            if overlaps == 0:
+                break
+    return best
+
+
+def place_labels(nodes, edges, cell_size=50):
+    """
+    Choose edge label positions and bend signs that avoid overlapping nodes, edges and other labels.
+    Nodes and placed labels are indexed in a uniform grid and edges as a few segments in a
+    SegmentIndex; labels are then placed edge by edge (sorted along the x axis), each group of
+    parallel edges trying both bend orientations. A query only looks at the items near its box,
+    so the cost grows with the number of edges and of genuine near-collisions.
+    Args:
+        nodes (dict): Node data from LayeredLayout.get_inkscape_data ('x', 'y', 'style').
+        edges (list): Edge data from LayeredLayout.get_inkscape_data, updated in place with
+            'label_side' (1 = left of start -> end, -1 = right), 'label_pos' and possibly a mirrored 'bend'.
+        cell_size (int): Size of the grid cells.
+    Returns:
+        list: The updated edges.
+    """
+    grid = UniformGrid(cell_size)
+    segments = SegmentIndex()
+
+    # 1. Obstacles: nodes, then edges split into a few segments
+    for node in nodes.values():
+        half = (BLOB_SIZE if node.get('style') == 'blob' else NODE_SIZE) / 2
+        grid.insert((node['x'] - half, node['y'] - half, node['x'] + half, node['y'] + half))
+
+    groups = {}
+    for edge in edges:
+        pair = tuple(sorted((edge['start_node'], edge['end_node'])))
+        groups.setdefault(pair, []).append(edge)
+        # Curves are identified by pair and bend, so a mirrored group keeps the same owners
+        for start, end in _curve_segments(edge['start'], edge['end'], edge['bend']):
+            segments.insert(start, end, owner=(pair, edge['bend']))
+
+    # 2. Labels, group by group from left to right
+    def midpoint_x(item):
+        first = item[1][0]
+        return (first['start'][0] + first['end'][0]) / 2
+
+    for pair, members in sorted(groups.items(), key=midpoint_x):
+        orientations = [1, -1] if any(e['bend'] for e in members) else [1]
+        best = None
+        for sign in orientations:
+            choices = [_best_label(grid, segments, e, sign * e['bend'], (pair, sign * e['bend'])) for e in members]
+            score = sum(c[0] for c in choices)
+            if best is None or score < best[0]:
+                best = (score, sign, choices)
+        _, sign, choices = best
+        for edge, (_, side, box, center) in zip(members, choices):
+            edge['bend'] = round(sign * edge['bend'], 2) + 0.0
+            edge['label_side'] = side
+            edge['label_pos'] = (round(center[0], 1), round(center[1], 1))
+            grid.insert(box)
+
+    return edges
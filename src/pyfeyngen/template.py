@@ -0,0 +1,155 @@
+import copy
+import itertools
+import re
+from .parser import parse_reaction
+from .layout import FeynmanGraph
+from .layout_engine import LayeredLayout
+from .exporter import generate_physical_tikz
+from .errors import UnboundPlaceholderError
+
+# Placeholder in a particle name, e.g. "$q" or "$l" in "$l+"
+PLACEHOLDER = re.compile(r"\$([A-Za-z_][A-Za-z0-9_]*)")
+
+
+class ReactionTemplate:
+    """
+    A reaction parsed and built once, with particle placeholders ($name) substituted at render time.
+    Rendering only substitutes names, looks up styles/labels and formats the output; the parse,
+    the graph topology and the layout are shared by every rendering.
+    """
+    def __init__(self, template, x_spacing=150, y_spacing=100):
+        """
+        Compile a reaction template.
+        Args:
+            template (str): Reaction string with placeholders (e.g. "$q $qbar > Z0 > $l+ $l-").
+            x_spacing (int): Horizontal distance between columns for geometry output.
+            y_spacing (int): Vertical distance between nodes for geometry output.
+        Raises:
+            InvalidReactionError: If the template syntax is incorrect.
+        """
+        self.template = template
+        self.x_spacing = x_spacing
+        self.y_spacing = y_spacing
+        self.graph = FeynmanGraph(parse_reaction(template))
+        # Node positions, computed on the first geometry request
+        self.positions = None
+
+        # Distinct particle names of the graph and the placeholders they contain
+        self.placeholders = set()
+        self._templated_names = set()
+        for _, _, particle in self.graph.edges:
+            if isinstance(particle, str):
+                found = PLACEHOLDER.findall(particle)
+                if found:
+                    self.placeholders.update(found)
+                    self._templated_names.add(particle)
+
+    def _bind_graph(self, bindings):
+        """
+        Return a shallow copy of the graph with placeholders replaced in particle names.
+        Args:
+            bindings (dict): Mapping from placeholder name (without '$') to particle name.
+        Returns:
+            FeynmanGraph: Graph sharing nodes and styles with the template.
+        Raises:
+            UnboundPlaceholderError: If a placeholder has no binding.
+        """
+        missing = self.placeholders.difference(bindings)
+        if missing:
+            names = ", ".join(f"${name}" for name in sorted(missing))
+            raise UnboundPlaceholderError(f"Unbound placeholder(s): {names}.")
+
+        names = {name: PLACEHOLDER.sub(lambda m: bindings[m.group(1)], name) for name in self._templated_names}
+
+        graph = copy.copy(self.graph)
+        graph.edges = [(src, dst, names.get(particle, particle) if isinstance(particle, str) else particle)
+                       for src, dst, particle in self.graph.edges]
+        return graph
+
+    def _layout(self, graph):
+        """Return a layout engine for a bound graph, reusing the template node positions."""
+        # Concurrent first calls may both compute the layout; the results are identical
+        if self.positions is None:
+            self.positions = LayeredLayout(self.graph, self.x_spacing, self.y_spacing).compute_layout()
+        engine = LayeredLayout(graph, self.x_spacing, self.y_spacing)
+        engine.positions = self.positions
+        return engine
+
+    def render(self, bindings, user_dict=None, place_labels=False):
+        """
+        Generate TikZ code for one set of placeholder bindings.
+        Args:
+            bindings (dict): Mapping from placeholder name (without '$') to particle name.
+            user_dict (dict, optional): Custom particle info dictionary.
+            place_labels (bool): If True, label sides and bends avoid collisions (see quick_render).
+        Returns:
+            str: TikZ code for the Feynman diagram.
+        """
+        graph = self._bind_graph(bindings)
+        placements = self._layout(graph).get_label_placements(user_dict) if place_labels else None
+        return generate_physical_tikz(graph, user_dict, placements)
+
+    def geometry(self, bindings, place_labels=False):
+        """
+        Return node coordinates and edge metadata for one set of placeholder bindings.
+        Args:
+            bindings (dict): Mapping from placeholder name (without '$') to particle name.
+            place_labels (bool): If True, labels avoid collisions (see quick_geometry).
+        Returns:
+            dict: Geometry data for nodes and edges, as in quick_geometry.
+        """
+        return self._layout(self._bind_graph(bindings)).get_inkscape_data(place_labels=place_labels)
+
+    def render_product(self, choices, user_dict=None, place_labels=False):
+        """
+        Render TikZ code for every combination of the given choices.
+        Args:
+            choices (dict): Mapping from placeholder name to a list of particle names. A tuple of
+                names binds several placeholders together, e.g. {("q", "qbar"): [("u", "ubar"), ("d", "dbar")]}.
+            user_dict (dict, optional): Custom particle info dictionary.
+            place_labels (bool): If True, label sides and bends avoid collisions (see quick_render).
+        Yields:
+            tuple: (bindings, TikZ code) for each combination, in cartesian-product order.
+        """
+        for bindings in iter_bindings(choices):
+            yield bindings, self.render(bindings, user_dict, place_labels)
+
+    def geometry_product(self, choices, place_labels=False):
+        """
+        Return geometry data for every combination of the given choices (see render_product).
+        Yields:
+            tuple: (bindings, geometry dict) for each combination, in cartesian-product order.
+        """
+        for bindings in iter_bindings(choices):
+            yield bindings, self.geometry(bindings, place_labels)
+
+
+def iter_bindings(choices):
+    """
+    Expand a choices mapping into the cartesian product of bindings.
+    Args:
+        choices (dict): Mapping from placeholder name (or tuple of names) to a list of values
+            (or tuples of values).
+    Yields:
+        dict: One mapping from placeholder name to particle name per combination.
+    """
+    keys = [key if isinstance(key, tuple) else (key,) for key in choices]
+    values = [[v if isinstance(v, tuple) else (v,) for v in options] for options in choices.values()]
+    for combination in itertools.product(*values):
+        bindings = {}
+        for names, picked in zip(keys, combination):
+            bindings.update(zip(names, picked))
+        yield bindings
+
+
+def compile_reaction(template, x_spacing=150, y_spacing=100):
+    """
+    Parse a reaction template and build its graph once for repeated rendering.
+    Args:
+        template (str): Reaction string with $name placeholders.
+        x_spacing (int): Horizontal distance between columns for geometry output.
+        y_spacing (int): Vertical distance between nodes for geometry output.
+    Returns:
+        ReactionTemplate: The compiled template.
+    """
+    return ReactionTemplate(template, x_spacing, y_spacing)
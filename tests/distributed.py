@@ -0,0 +1,102 @@
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import pyfeyngen
+from pyfeyngen.distributed import FileQueue, submit_batch, run_worker, collect_results
+
+reactions = [
+    "e+ e- > Z0 > mu+ mu-",
+    "u ubar > X > e+ e-",
+    'u ubar > H > (Z0 > e+ e-) (Z0 > mu+ mu-)',
+    'e- e- > [gamma gamma] > e- e-',
+    'e+ > (e- > @A{blob} > e-) (e- > @A > e-)',
+    'e- e- > ([gamma gamma])*3 > e- e-',
+    "e+ (e- > Z0",
+] * 50
+
+directory = tempfile.mkdtemp()
+queue = FileQueue(directory)
+shards = submit_batch(queue, reactions, shard_size=16)
+print(f"Testing: {len(reactions)} reactions in {shards} shards")
+
+# A worker that leases a shard and dies: its lease must expire and the shard be retried
+crashed = queue.claim("crashed-worker", lease_seconds=0.5)
+
+
+def start_workers(directory, count):
+    """Start worker processes, as on other nodes, each with its own hash seed."""
+    return [subprocess.Popen([sys.executable, "-m", "pyfeyngen.distributed", directory],
+                             env=dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path), PYTHONHASHSEED=str(seed)))
+            for seed in range(1, count + 1)]
+
+# Two worker processes and one local worker thread
+workers = start_workers(directory, 2)
+local = threading.Thread(target=run_worker, args=(FileQueue(directory),),
+                         kwargs={"worker_id": "local", "poll_interval": 0.1})
+local.start()
+
+results = collect_results(queue, poll_interval=0.1, timeout=120)
+local.join()
+for worker in workers:
+    worker.wait()
+
+expected = [pyfeyngen.quick_render(r) for r in reactions]
+if results != expected:
+    print("  ERROR: distributed results differ from quick_render")
+if crashed is None:
+    print("  ERROR: no shard could be leased")
+if os.listdir(os.path.join(directory, "leases")):
+    print("  ERROR: leases of finished shards were not removed")
+
+# A worker whose lease expired must not release the lease of the worker that took over
+directory = tempfile.mkdtemp()
+submit_batch(FileQueue(directory), reactions[:4], shard_size=2)
+late, current, other = FileQueue(directory), FileQueue(directory), FileQueue(directory)
+shard_id, attempt, _ = late.claim("late", lease_seconds=0)
+retry = current.claim("current", lease_seconds=60)
+late.release(shard_id, attempt)
+stolen = other.claim("other", lease_seconds=60)
+if retry[0] != shard_id or (stolen is not None and stolen[0] == shard_id):
+    print("  ERROR: a stale release freed a live lease")
+
+# Geometry mode: node positions must not depend on the process that rendered the shard
+directory = tempfile.mkdtemp()
+queue = FileQueue(directory)
+submit_batch(queue, reactions[:70], shard_size=2, mode="geometry")
+workers = start_workers(directory, 3)
+results = collect_results(queue, poll_interval=0.1, timeout=120)
+for worker in workers:
+    worker.wait()
+if results != [pyfeyngen.quick_geometry(r) for r in reactions[:70]]:
+    print("  ERROR: distributed geometry differs from quick_geometry")
+
+# Job options are forwarded to the renderers
+directory = tempfile.mkdtemp()
+queue = FileQueue(directory)
+submit_batch(queue, reactions[:14], shard_size=4, place_labels=True)
+run_worker(queue)
+if collect_results(queue) != [pyfeyngen.quick_render(r, place_labels=True) for r in reactions[:14]]:
+    print("  ERROR: place_labels is not forwarded to distributed workers")
+queue = FileQueue(tempfile.mkdtemp())
+submit_batch(queue, reactions[:14], shard_size=4, mode="geometry", place_labels=True)
+run_worker(queue)
+if collect_results(queue) != [pyfeyngen.quick_geometry(r, place_labels=True) for r in reactions[:14]]:
+    print("  ERROR: place_labels is not forwarded to distributed geometry workers")
+
+# Workers started before the job is submitted wait for it
+directory = tempfile.mkdtemp()
+workers = start_workers(directory, 2)
+submit_batch(FileQueue(directory), reactions[:14], shard_size=4)
+results = collect_results(FileQueue(directory), poll_interval=0.1, timeout=120)
+for worker in workers:
+    if worker.wait() != 0:
+        print("  ERROR: a worker started before the job failed")
+if results != [pyfeyngen.quick_render(r) for r in reactions[:14]]:
+    print("  ERROR: workers started before the job returned wrong results")
+try:
+    run_worker(FileQueue(tempfile.mkdtemp()), poll_interval=0.05, timeout=0.2)
+    print("  ERROR: a worker without a job did not time out")
+except TimeoutError:
+    pass
@@ -18,7 +18,13 @@ reactions = [
     'H > (Z0  > @link e+ e-) (Z0  > @link mu+ mu-)',
     'n > @v1{blob} > p e- nubar_e',
     'e- > @box:gamma e- > @box',
-    'pibar_e > @v1{blob} > (pi > e+ e-) (pi_e > mu+ mu-)'
+    'pibar_e > @v1{blob} > (pi > e+ e-) (pi_e > mu+ mu-)',
+    'e- e- > ([gamma gamma])*3 > e- e-', # Valide avec Répétition
+    'e- > [gamma gamma] >^3 e-', # Valide avec Répétition
+    'let Zll = (Z0 > e+ e-); H > Zll Zll', # Valide avec Macro
+    'e- > (gamma)*0 > e-', # Erreur : Répétition nulle
+    'u ubar > H > (Z0 > e+ e-)*2 > X', # Erreur : Répétition tronquée
+    'e- > (gamma)*3{blob} > e-', # Erreur : Style sur une répétition
 ]
 
 for r in reactions:
@@ -31,4 +37,69 @@ for r in reactions:
 for r in reactions:
     print(f"Testing: {r}")
     result = pyfeyngen.quick_geometry(r)
-    print(result)
\ No newline at end of file
+    print(result)
+template = pyfeyngen.compile_reaction('$q $qbar > Z0 > $l+ $l-')
+choices = {('q', 'qbar'): [('u', 'ubar'), ('d', 'dbar')], 'l': ['e', 'mu']}
+for bindings, result in template.render_product(choices):
+    print(f"Testing template: {bindings}")
+    print(result)
+    expected = pyfeyngen.quick_render(f"{bindings['q']} {bindings['qbar']} > Z0 > {bindings['l']}+ {bindings['l']}-")
+    if result != expected:
+        print("  ERROR: template output differs from quick_render")
+for bindings, result in template.render_product(choices, place_labels=True):
+    expected = pyfeyngen.quick_render(f"{bindings['q']} {bindings['qbar']} > Z0 > {bindings['l']}+ {bindings['l']}-", place_labels=True)
+    if result != expected:
+        print("  ERROR: template output with label placement differs from quick_render")
+
+graph = pyfeyngen.FeynmanGraph(pyfeyngen.parse_reaction('e- e- > ([gamma gamma])*1000 > e- e-'))
+preview, blobs = pyfeyngen.collapse_graph(graph, max_size=50)
+print(f"Testing collapse: {len(graph.edges)} edges -> {len(preview.edges)} edges, blobs {blobs.keys()}")
+print(pyfeyngen.generate_physical_tikz(preview))
+hidden = sum(len(b['edges']) for b in blobs.values())
+if len(preview.edges) + hidden != len(graph.edges):
+    print("  ERROR: collapsed edges do not add up")
+# Anchor links crossing into collapsed subtrees stay drawn and are not counted as hidden
+graph = pyfeyngen.FeynmanGraph(pyfeyngen.parse_reaction('H > (Z0 > gamma > gamma @link > e+ e-) (Z0 > gamma > gamma @link > mu+ mu-)'))
+preview, blobs = pyfeyngen.collapse_graph(graph, max_depth=2)
+print(f"Testing collapse with anchors: {len(graph.edges)} edges -> {len(preview.edges)} edges, blobs {blobs}")
+hidden = sum(len(b['edges']) for b in blobs.values())
+if len(preview.edges) + hidden != len(graph.edges) or not any(b['rewired'] for b in blobs.values()):
+    print("  ERROR: collapsed edges with anchors do not add up")
+
+from pyfeyngen.placement import UniformGrid, label_box
+dense = 'H > (Z0 > e+ e-) (Z0 > mu+ mu-) (gamma > e+ e-) (g > u ubar)'
+print(f"Testing label placement: {dense}")
+print(pyfeyngen.quick_render(dense, place_labels=True))
+boxes = [label_box(e['label'], e['label_pos']) for e in pyfeyngen.quick_geometry(dense, place_labels=True)['edges']]
+grid = UniformGrid(50)
+for i, box in enumerate(boxes):
+    grid.insert(box, owner=i)
+for i, box in enumerate(boxes):
+    if grid.count_overlaps(box, ignore=i):
+        print(f"  ERROR: label at {box} overlaps another label")
+# Label boxes are sized from the labels actually rendered
+custom = {'Z0': {'style': 'boson', 'label': 'Z^{0}_{\\mathrm{very\\ long\\ label}}', 'is_anti': False}}
+edges = pyfeyngen.LayeredLayout(pyfeyngen.FeynmanGraph(pyfeyngen.parse_reaction(dense))).get_inkscape_data(custom, place_labels=True)['edges']
+if custom['Z0']['label'] not in [e['label'] for e in edges]:
+    print("  ERROR: label placement ignored user_dict")
+
+import os
+import tempfile
+from pyfeyngen import particledb
+from pyfeyngen.physics import get_info
+
+for name in ['pi+', 'Kbar0', 'J/psi', 'Lambda_c+']:
+    print(f"Testing particle database: {name} -> {get_info(name)}")
+# Built-in particles return the same information as the database
+for name, info in pyfeyngen.physics.PARTICLES.items():
+    if particledb.lookup(name) != info:
+        print(f"  ERROR: PARTICLES and the particle database disagree on '{name}'")
+
+# A PDG-scale table written, memory-mapped and searched
+table = {f"X{i}": {'style': 'scalar', 'label': f"X_{{{i}}}", 'is_anti': False, 'charge': '-1/3'} for i in range(20000)}
+path = os.path.join(tempfile.mkdtemp(), 'table.pfdb')
+particledb.write_particle_database(table, path)
+pyfeyngen.set_particle_database(path)
+if get_info('X12345')['label'] != 'X_{12345}' or get_info('X12345')['charge'] != -1 / 3:
+    print("  ERROR: wrong lookup in a written particle database")
+pyfeyngen.set_particle_database(particledb.DEFAULT_PATH)
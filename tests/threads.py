@@ -0,0 +1,63 @@
+import random
+import pyfeyngen
+
+reactions = [
+    "e+ e- > Z0 > mu+ mu-",
+    "u ubar > X > e+ e-",
+    'u ubar > H > (Z0 > e+ e-) (Z0 > mu+ mu-)',
+    'e- e- > [gamma gamma] > e- e-',
+    'u ubar > H > (Z0 @link > e+ e-) (Z0 @link > mu+ mu-)',
+    'e+ > (e- > @A{blob} > e-) (e- > @A > e-)',
+    'n > @v1{blob} > p e- nubar_e',
+    'e- > @box:gamma e- > @box',
+    'e- e- > ([gamma gamma])*3 > e- e-',
+    'let Zll = (Z0 > e+ e-); H > Zll Zll',
+    "e+ (e- > Z0",
+]
+
+# Reference outputs computed on a single thread
+expected_tikz = [pyfeyngen.quick_render(r) for r in reactions]
+expected_geometry = [pyfeyngen.quick_geometry(r) for r in reactions]
+
+# Same reactions, shuffled and repeated, rendered concurrently
+random.seed(0)
+indices = [random.randrange(len(reactions)) for _ in range(5000)]
+batch = [reactions[i] for i in indices]
+
+print(f"Testing: {len(batch)} renders on 32 threads")
+results = pyfeyngen.quick_render_batch(batch, max_workers=32)
+errors = sum(result != expected_tikz[i] for i, result in zip(indices, results))
+if errors:
+    print(f"  ERROR: {errors} TikZ outputs differ from the single-threaded run")
+
+print(f"Testing: {len(batch)} geometries on 32 threads")
+results = pyfeyngen.quick_geometry_batch(batch, max_workers=32)
+errors = sum(result != expected_geometry[i] for i, result in zip(indices, results))
+if errors:
+    print(f"  ERROR: {errors} geometry outputs differ from the single-threaded run")
+
+# Callers mutating a lookup result must not change later renders
+pyfeyngen.physics.get_info("e-")["label"] = "mutated"
+if pyfeyngen.quick_render(reactions[0]) != expected_tikz[0]:
+    print("  ERROR: get_info returned shared particle data")
+
+# Debug logging turned on from many threads installs a single handler
+pyfeyngen.quick_render_batch(reactions * 10, debug=True, max_workers=32)
+if len(pyfeyngen.logger.handlers) != 1:
+    print(f"  ERROR: {len(pyfeyngen.logger.handlers)} logging handlers installed")
+
+# Debug output is per call: the shared logger level is not changed for other renders
+import logging
+records = []
+capture = logging.Handler()
+capture.emit = records.append
+pyfeyngen.logger.addHandler(capture)
+pyfeyngen.quick_render_batch(reactions * 10, max_workers=32)
+pyfeyngen.logger.removeHandler(capture)
+if pyfeyngen.logger.isEnabledFor(logging.DEBUG) or any(r.levelno == logging.DEBUG for r in records):
+    print("  ERROR: debug output leaked into renders without debug=True")
+
+# Batches produce the same output as single renders with label placement
+placed = pyfeyngen.quick_render_batch(reactions, max_workers=8, place_labels=True)
+if placed != [pyfeyngen.quick_render(r, place_labels=True) for r in reactions]:
+    print("  ERROR: place_labels is not forwarded by quick_render_batch")